@@ -3,18 +3,21 @@ Daily Market Summary Email Agent
 Fetches market data, generates summary, and sends email report
 """
 
-import yfinance as yf
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
+import atexit
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.image import MIMEImage
-import matplotlib.pyplot as plt
 import io
-import schedule
-import time
-from typing import Dict, List, Tuple
+import re
+import string
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
 import logging
 
 # Configure logging
@@ -25,6 +28,37 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+# Static email layout; only the date, summary and table change per run
+EMAIL_TEMPLATE = string.Template("""
+    <html>
+        <body style="font-family: Arial, sans-serif; max-width: 800px; margin: 0 auto; padding: 20px;">
+            <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 30px; border-radius: 10px; color: white; margin-bottom: 20px;">
+                <h1 style="margin: 0; font-size: 28px;">📈 Daily Market Brief</h1>
+                <p style="margin: 5px 0 0 0; opacity: 0.9;">$date</p>
+            </div>
+            
+            <div style="background-color: #f8f9fa; padding: 20px; border-radius: 8px; margin-bottom: 20px;">
+                <pre style="font-family: Arial, sans-serif; white-space: pre-wrap; margin: 0;">$summary</pre>
+            </div>
+            
+            <h2 style="color: #2c3e50; border-bottom: 2px solid #3498db; padding-bottom: 10px;">Market Performance</h2>
+            $table
+            
+            <div style="margin: 30px 0;">
+                <img src="cid:chart" style="max-width: 100%; height: auto; border-radius: 8px; box-shadow: 0 2px 8px rgba(0,0,0,0.1);">
+            </div>
+            
+            <div style="margin-top: 30px; padding: 20px; background-color: #ecf0f1; border-radius: 8px; text-align: center;">
+                <p style="margin: 0; color: #7f8c8d; font-size: 14px;">
+                    Generated by Your Market Summary Agent 🤖<br>
+                    Have a great trading day!
+                </p>
+            </div>
+        </body>
+    </html>
+    """)
+
+
 class MarketDataCollector:
     """Fetches and processes market data from Yahoo Finance"""
     
@@ -40,38 +74,157 @@ class MarketDataCollector:
         "Nasdaq 100": "^NDX"
     }
     
+    # Region patterns, compiled once rather than on every fetch
+    INDIAN_PATTERN = re.compile(r'Nifty|Sensex')
+    US_PATTERN = re.compile(r'S&P|Dow|Nasdaq|Russell')
+    
+    CACHE_DIR = Path("cache")
+    CACHE_TTL = timedelta(hours=4)
+    
     def fetch_market_data(self) -> pd.DataFrame:
         """Fetch current and previous day data for all indices"""
-        data = []
+        cached = self._load_cache()
+        if cached is not None:
+            logger.info("Using cached market data")
+            return cached
         
-        for name, symbol in self.INDICES.items():
-            try:
-                ticker = yf.Ticker(symbol)
-                # Get last 5 days to ensure we have previous close
-                hist = ticker.history(period="5d")
-                
-                if len(hist) >= 2:
-                    current_price = hist['Close'].iloc[-1]
-                    previous_close = hist['Close'].iloc[-2]
-                    change = current_price - previous_close
-                    pct_change = (change / previous_close) * 100
-                    
-                    data.append({
-                        'Index': name,
-                        'Symbol': symbol,
-                        'Current': round(current_price, 2),
-                        'Previous': round(previous_close, 2),
-                        'Change': round(change, 2),
-                        'Change %': round(pct_change, 2)
-                    })
-                    logger.info(f"Fetched data for {name}: {pct_change:.2f}%")
-                else:
-                    logger.warning(f"Insufficient data for {name}")
-                    
-            except Exception as e:
-                logger.error(f"Error fetching {name}: {str(e)}")
-                
-        return pd.DataFrame(data)
+        df = self._download_market_data()
+        # Only cache complete results so a rerun can retry failed indices
+        if len(df) == len(self.INDICES):
+            self._save_cache(df)
+        return df
+    
+    def _cache_path(self) -> Path:
+        """Cache file for today's market data"""
+        return self.CACHE_DIR / f"market_{datetime.now().strftime('%Y%m%d')}.pkl"
+    
+    def _load_cache(self) -> Optional[pd.DataFrame]:
+        """Load today's cached data if present and still fresh"""
+        path = self._cache_path()
+        try:
+            if not path.exists():
+                return None
+            age = datetime.now() - datetime.fromtimestamp(path.stat().st_mtime)
+            if age > self.CACHE_TTL:
+                return None
+            return pd.read_pickle(path)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable cache {path}: {str(e)}")
+            return None
+    
+    def _save_cache(self, df: pd.DataFrame):
+        """Persist fetched data so reruns within the TTL skip Yahoo"""
+        path = self._cache_path()
+        try:
+            self.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            df.to_pickle(path)
+            
+            # Drop earlier days' files, which are never read again
+            for old in self.CACHE_DIR.glob("market_*.pkl"):
+                if old != path:
+                    old.unlink()
+        except Exception as e:
+            logger.warning(f"Failed to write cache {path}: {str(e)}")
+    
+    def _download_market_data(self) -> pd.DataFrame:
+        """Download current and previous day data from Yahoo Finance"""
+        symbols = list(self.INDICES.values())
+        names = pd.Series({symbol: name for name, symbol in self.INDICES.items()})
+        
+        # Fetch all indices in a single batched request
+        try:
+            hist = self._download_batch(symbols)
+            closes = hist.xs('Close', level=1, axis=1)
+        except Exception as e:
+            logger.error(f"Batch download failed: {str(e)}")
+            closes = pd.DataFrame()
+        
+        # Symbols that failed inside the batch come back as empty columns
+        closes = closes.reindex(columns=symbols).astype(float)
+        last, prev = self._last_two_closes(closes)
+        missing = closes.columns[closes.notna().sum() == 0]
+        
+        # Fall back to parallel per-ticker requests for anything the batch missed
+        if len(missing):
+            with ThreadPoolExecutor(max_workers=len(missing)) as ex:
+                futures = {
+                    ex.submit(self._fetch_one, names[sym], sym): sym
+                    for sym in missing
+                }
+                for future in as_completed(futures):
+                    result = future.result()
+                    if result is not None:
+                        symbol = futures[future]
+                        last[symbol], prev[symbol] = result
+        
+        available = last.notna() & prev.notna()
+        for symbol in last.index[~available]:
+            logger.warning(f"Insufficient data for {names[symbol]}")
+        last, prev = last[available], prev[available]
+        
+        # Compute all changes in one vectorized step; rounding is left to display
+        change = last - prev
+        pct_change = change / prev * 100
+        df = pd.DataFrame({
+            'Index': names[last.index].values,
+            'Symbol': last.index,
+            'Current': last.values,
+            'Previous': prev.values,
+            'Change': change.values,
+            'Change %': pct_change.values
+        })
+        for name, pct in zip(df['Index'], df['Change %']):
+            logger.info(f"Fetched data for {name}: {pct:.2f}%")
+        
+        # Tag each index with its region once so analysis can group on it
+        if not df.empty:
+            df['Region'] = np.where(
+                df['Index'].str.contains(self.INDIAN_PATTERN), 'IN',
+                np.where(df['Index'].str.contains(self.US_PATTERN), 'US', 'OTHER')
+            )
+        return df
+    
+    @staticmethod
+    def _last_two_closes(closes: pd.DataFrame) -> Tuple[pd.Series, pd.Series]:
+        """Latest and previous valid close per symbol, skipping market holidays"""
+        valid = closes.notna()
+        position = valid.cumsum().where(valid)
+        count = valid.sum()
+        last = closes.where(position.eq(count)).max()
+        prev = closes.where(position.eq(count - 1)).max()
+        return last, prev
+    
+    def _download_batch(self, symbols: List[str]) -> pd.DataFrame:
+        """Download recent history for several symbols in one request"""
+        import yfinance as yf
+        return yf.download(
+            symbols,
+            period="5d",
+            group_by='ticker',
+            threads=True,
+            progress=False,
+            auto_adjust=False
+        )
+    
+    def _fetch_one(self, name: str, symbol: str) -> Optional[Tuple[float, float]]:
+        """Fetch (current, previous) closes for one index, or None on failure"""
+        try:
+            hist = self._download_one(symbol)
+            closes = hist['Close'].dropna()
+            if len(closes) < 2:
+                return None
+            return closes.iloc[-1], closes.iloc[-2]
+        except Exception as e:
+            logger.error(f"Error fetching {name}: {str(e)}")
+            return None
+    
+    def _download_one(self, symbol: str) -> pd.DataFrame:
+        """Download recent history for a single symbol"""
+        import yfinance as yf
+        ticker = yf.Ticker(symbol)
+        # fast_info is no lighter (it downloads 1y of daily and 5d of hourly
+        # bars) and its last price is intraday rather than a close
+        return ticker.history(period="5d")
 
 
 class MarketAnalyzer:
@@ -82,32 +235,57 @@ class MarketAnalyzer:
         if df.empty:
             return {}
         
-        # Identify best and worst performers
-        best_performer = df.loc[df['Change %'].idxmax()]
-        worst_performer = df.loc[df['Change %'].idxmin()]
+        change = df['Change %']
+        arr = change.to_numpy()
+        # Count direction on the displayed 2-decimal value, as the table does
+        shown = np.round(arr, 2)
         
-        # Calculate average changes
-        avg_change = df['Change %'].mean()
+        # Identify best and worst performers as plain scalars
+        best_idx = change.idxmax()
+        worst_idx = change.idxmin()
         
-        # Separate Indian and US markets
-        indian_indices = df[df['Index'].str.contains('Nifty|Sensex')]
-        us_indices = df[df['Index'].str.contains('S&P|Dow|Nasdaq|Russell')]
+        # Regional averages in a single groupby
+        region_avg = df.groupby('Region')['Change %'].mean()
         
         return {
-            'best_performer': best_performer,
-            'worst_performer': worst_performer,
-            'avg_change': avg_change,
-            'indian_avg': indian_indices['Change %'].mean() if not indian_indices.empty else 0,
-            'us_avg': us_indices['Change %'].mean() if not us_indices.empty else 0,
-            'positive_count': len(df[df['Change %'] > 0]),
-            'negative_count': len(df[df['Change %'] < 0]),
-            'total_count': len(df)
+            'best_performer': {
+                'Index': df.at[best_idx, 'Index'],
+                'Change %': float(df.at[best_idx, 'Change %'])
+            },
+            'worst_performer': {
+                'Index': df.at[worst_idx, 'Index'],
+                'Change %': float(df.at[worst_idx, 'Change %'])
+            },
+            'avg_change': float(arr.mean()),
+            'indian_avg': float(region_avg.get('IN', 0)),
+            'us_avg': float(region_avg.get('US', 0)),
+            'positive_count': int((shown > 0).sum()),
+            'negative_count': int((shown < 0).sum()),
+            'total_count': arr.size
         }
 
 
 class ContentGenerator:
     """Generates human-readable market summary"""
     
+    TABLE_HEADER = """
+        <table style="border-collapse: collapse; width: 100%; margin: 20px 0;">
+            <thead>
+                <tr style="background-color: #2c3e50; color: white;">
+                    <th style="padding: 12px; text-align: left; border: 1px solid #ddd;">Index</th>
+                    <th style="padding: 12px; text-align: right; border: 1px solid #ddd;">Current</th>
+                    <th style="padding: 12px; text-align: right; border: 1px solid #ddd;">Change</th>
+                    <th style="padding: 12px; text-align: right; border: 1px solid #ddd;">Change %</th>
+                </tr>
+            </thead>
+            <tbody>
+        """
+    
+    TABLE_FOOTER = """
+            </tbody>
+        </table>
+        """
+    
     def generate_summary(self, df: pd.DataFrame, insights: Dict) -> str:
         """Create narrative summary from data"""
         if df.empty or not insights:
@@ -160,55 +338,60 @@ class ContentGenerator:
         if df.empty:
             return "<p>No data available</p>"
         
-        html = """
-        <table style="border-collapse: collapse; width: 100%; margin: 20px 0;">
-            <thead>
-                <tr style="background-color: #2c3e50; color: white;">
-                    <th style="padding: 12px; text-align: left; border: 1px solid #ddd;">Index</th>
-                    <th style="padding: 12px; text-align: right; border: 1px solid #ddd;">Current</th>
-                    <th style="padding: 12px; text-align: right; border: 1px solid #ddd;">Change</th>
-                    <th style="padding: 12px; text-align: right; border: 1px solid #ddd;">Change %</th>
-                </tr>
-            </thead>
-            <tbody>
-        """
+        # Precompute per-row styling for all rows at once, classifying on the
+        # displayed 2-decimal value so arrows match the numbers shown
+        pct = df['Change %'].to_numpy()
+        shown = np.round(pct, 2)
+        colors = np.where(shown > 0, "#27ae60", np.where(shown < 0, "#e74c3c", "#95a5a6"))
+        arrows = np.where(shown > 0, "▲", np.where(shown < 0, "▼", "•"))
         
-        for _, row in df.iterrows():
-            color = "#27ae60" if row['Change %'] > 0 else "#e74c3c" if row['Change %'] < 0 else "#95a5a6"
-            arrow = "▲" if row['Change %'] > 0 else "▼" if row['Change %'] < 0 else "•"
-            
-            html += f"""
+        rows = [
+            f"""
                 <tr style="border-bottom: 1px solid #ddd;">
-                    <td style="padding: 10px; border: 1px solid #ddd;">{row['Index']}</td>
-                    <td style="padding: 10px; text-align: right; border: 1px solid #ddd;">{row['Current']:,.2f}</td>
+                    <td style="padding: 10px; border: 1px solid #ddd;">{index}</td>
+                    <td style="padding: 10px; text-align: right; border: 1px solid #ddd;">{current:,.2f}</td>
                     <td style="padding: 10px; text-align: right; border: 1px solid #ddd; color: {color};">
-                        {arrow} {abs(row['Change']):.2f}
+                        {arrow} {abs(change):.2f}
                     </td>
                     <td style="padding: 10px; text-align: right; border: 1px solid #ddd; color: {color}; font-weight: bold;">
-                        {row['Change %']:+.2f}%
+                        {change_pct:+.2f}%
                     </td>
                 </tr>
             """
-        
-        html += """
-            </tbody>
-        </table>
-        """
-        return html
+            for index, current, change, change_pct, color, arrow in zip(
+                df['Index'], df['Current'], df['Change'], pct, colors, arrows
+            )
+        ]
+        return "".join([self.TABLE_HEADER, *rows, self.TABLE_FOOTER])
 
 
 class ChartGenerator:
     """Creates visual charts for market data"""
     
+    def __init__(self):
+        # Built on first use and redrawn into on every run
+        self.fig = None
+        self.ax = None
+    
+    def _get_axes(self):
+        """Create the shared figure, importing matplotlib on first call"""
+        if self.fig is None:
+            import matplotlib
+            matplotlib.use('Agg')
+            import matplotlib.pyplot as plt
+            self.fig, self.ax = plt.subplots(figsize=(12, 6))
+        return self.ax
+    
     def create_performance_chart(self, df: pd.DataFrame) -> bytes:
         """Generate bar chart of market performance"""
         if df.empty:
             return None
         
-        fig, ax = plt.subplots(figsize=(12, 6))
+        ax = self._get_axes()
+        ax.clear()
         
-        # Create color list based on positive/negative
-        colors = ['#27ae60' if x > 0 else '#e74c3c' for x in df['Change %']]
+        # Create color list based on the displayed (2-decimal) sign
+        colors = ['#27ae60' if x > 0 else '#e74c3c' for x in df['Change %'].round(2)]
         
         # Create bar chart
         bars = ax.barh(df['Index'], df['Change %'], color=colors, alpha=0.8)
@@ -220,20 +403,22 @@ class ChartGenerator:
         ax.grid(axis='x', alpha=0.3, linestyle='--')
         
         # Add value labels
-        for bar, value in zip(bars, df['Change %']):
+        for bar, value in zip(bars, df['Change %'].round(2)):
             x_pos = value + (0.1 if value > 0 else -0.1)
             ax.text(x_pos, bar.get_y() + bar.get_height()/2, 
                    f'{value:+.2f}%', 
                    va='center', ha='left' if value > 0 else 'right',
                    fontweight='bold', fontsize=9)
         
-        plt.tight_layout()
+        self.fig.tight_layout()
         
         # Save to bytes
         buf = io.BytesIO()
-        plt.savefig(buf, format='png', dpi=150, bbox_inches='tight')
+        self.fig.savefig(
+            buf, format='png', dpi=100, bbox_inches='tight',
+            pil_kwargs={'optimize': True}
+        )
         buf.seek(0)
-        plt.close()
         
         return buf.getvalue()
 
@@ -246,16 +431,48 @@ class EmailNotifier:
         self.smtp_port = smtp_port
         self.sender_email = sender_email
         self.sender_password = sender_password
+        self._smtp: Optional[smtplib.SMTP] = None
+        atexit.register(self.close)
+    
+    def _get_smtp(self) -> smtplib.SMTP:
+        """Return a logged-in SMTP connection, reconnecting if it has dropped"""
+        if self._smtp is not None:
+            try:
+                if self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except (smtplib.SMTPServerDisconnected, OSError):
+                pass
+            self.close()
+        
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port)
+        try:
+            server.starttls()
+            server.login(self.sender_email, self.sender_password)
+        except BaseException:
+            server.close()
+            raise
+        self._smtp = server
+        return server
+    
+    def close(self):
+        """Close the cached SMTP connection, if any"""
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            self._smtp.close()
+        self._smtp = None
     
-    def send_email(self, recipient_email: str, subject: str, html_content: str, chart_data: bytes = None):
+    def send_email(self, recipient_email: Union[str, List[str]], subject: str, html_content: str, chart_data: bytes = None):
         """Send HTML email with optional chart attachment"""
         try:
             msg = MIMEMultipart('related')
+            # Recipients go in the envelope only (BCC) so they aren't exposed
+            # to each other; the visible To header is the sender
+            recipients = recipient_email if isinstance(recipient_email, list) else [recipient_email]
             msg['From'] = self.sender_email
-            if isinstance(recipient_email, list):
-                msg['To'] = ", ".join(recipient_email)
-            else:
-                msg['To'] = recipient_email            
+            msg['To'] = self.sender_email
             msg['Subject'] = subject
             
             # Add HTML content
@@ -269,26 +486,26 @@ class EmailNotifier:
                 msg.attach(image)
             
             # Send email
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.sender_email, self.sender_password)
-                
-                if isinstance(recipient_email, list):
-                    server.send_message(msg, to_addrs=recipient_email)
-                else:
-                    server.send_message(msg)
+            # One transaction delivers to every recipient
+            server = self._get_smtp()
+            server.send_message(msg, to_addrs=recipients)
 
             logger.info(f"Email sent successfully to {recipient_email}")
             return True
             
         except Exception as e:
             logger.error(f"Failed to send email: {str(e)}")
+            # Don't reuse a connection left in an unknown state
+            self.close()
             return False
 
 
 class MarketSummaryAgent:
     """Main agent orchestrating the market summary workflow"""
     
+    # Date of the last successful send, so restarts don't email twice a day
+    LAST_SENT_PATH = Path(".last_sent")
+    
     def __init__(self, email_config: Dict, recipient_email: str):
         self.collector = MarketDataCollector()
         self.analyzer = MarketAnalyzer()
@@ -296,10 +513,66 @@ class MarketSummaryAgent:
         self.chart_gen = ChartGenerator()
         self.notifier = EmailNotifier(**email_config)
         self.recipient_email = recipient_email
+        self._running = threading.Lock()
+        
+        # Emails are sent in the background so run() doesn't block on SMTP
+        self._mail_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mailer")
+        atexit.register(self._mail_pool.shutdown)
     
     def run(self):
+        """Execute the workflow unless a previous run is still in progress
+        
+        Returns True once the email has been queued for sending; the send
+        itself happens in the background and its outcome is only logged.
+        Returns False if the run was skipped or failed before sending.
+        """
+        if not self._running.acquire(blocking=False):
+            logger.warning("Market summary already in progress, skipping run")
+            return False
+        queued = False
+        try:
+            queued = self._run()
+            return queued
+        finally:
+            # A queued email releases the lock once it has been sent
+            if not queued:
+                self._running.release()
+    
+    def _on_email_sent(self, future: Future):
+        """Log the outcome of a background send and allow the next run"""
+        try:
+            if future.result():
+                logger.info("Market summary sent successfully!")
+                self._mark_sent_today()
+            else:
+                logger.error("Market summary email could not be sent")
+        except Exception as e:
+            logger.error(f"Market summary email could not be sent: {str(e)}")
+        finally:
+            self._running.release()
+    
+    def _sent_today(self) -> bool:
+        """Whether today's summary has already been sent"""
+        try:
+            last_sent = datetime.fromisoformat(self.LAST_SENT_PATH.read_text().strip())
+        except (OSError, ValueError):
+            return False
+        return last_sent.date() == datetime.now().date()
+    
+    def _mark_sent_today(self):
+        """Record today as sent"""
+        try:
+            self.LAST_SENT_PATH.write_text(datetime.now().date().isoformat())
+        except OSError as e:
+            logger.warning(f"Failed to record send date: {str(e)}")
+    
+    def _run(self):
         """Execute the complete market summary workflow"""
         try:
+            if self._sent_today():
+                logger.info("Market summary already sent today, skipping run")
+                return False
+            
             logger.info("Starting market summary generation...")
             
             # 1. Collect data
@@ -319,48 +592,24 @@ class MarketSummaryAgent:
             chart_data = self.chart_gen.create_performance_chart(df)
             
             # 5. Build email
-            html_body = f"""
-            <html>
-                <body style="font-family: Arial, sans-serif; max-width: 800px; margin: 0 auto; padding: 20px;">
-                    <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 30px; border-radius: 10px; color: white; margin-bottom: 20px;">
-                        <h1 style="margin: 0; font-size: 28px;">📈 Daily Market Brief</h1>
-                        <p style="margin: 5px 0 0 0; opacity: 0.9;">{datetime.now().strftime("%A, %B %d, %Y")}</p>
-                    </div>
-                    
-                    <div style="background-color: #f8f9fa; padding: 20px; border-radius: 8px; margin-bottom: 20px;">
-                        <pre style="font-family: Arial, sans-serif; white-space: pre-wrap; margin: 0;">{text_summary}</pre>
-                    </div>
-                    
-                    <h2 style="color: #2c3e50; border-bottom: 2px solid #3498db; padding-bottom: 10px;">Market Performance</h2>
-                    {html_table}
-                    
-                    <div style="margin: 30px 0;">
-                        <img src="cid:chart" style="max-width: 100%; height: auto; border-radius: 8px; box-shadow: 0 2px 8px rgba(0,0,0,0.1);">
-                    </div>
-                    
-                    <div style="margin-top: 30px; padding: 20px; background-color: #ecf0f1; border-radius: 8px; text-align: center;">
-                        <p style="margin: 0; color: #7f8c8d; font-size: 14px;">
-                            Generated by Your Market Summary Agent 🤖<br>
-                            Have a great trading day!
-                        </p>
-                    </div>
-                </body>
-            </html>
-            """
+            html_body = EMAIL_TEMPLATE.substitute(
+                date=datetime.now().strftime("%A, %B %d, %Y"),
+                summary=text_summary,
+                table=html_table
+            )
             
-            # 6. Send email
+            # 6. Queue email for sending
             subject = f"Daily Market Brief – {datetime.now().strftime('%d %b %Y')}"
-            success = self.notifier.send_email(
+            future = self._mail_pool.submit(
+                self.notifier.send_email,
                 self.recipient_email,
                 subject,
                 html_body,
                 chart_data
             )
+            future.add_done_callback(self._on_email_sent)
             
-            if success:
-                logger.info("Market summary sent successfully!")
-            
-            return success
+            return True
             
         except Exception as e:
             logger.error(f"Error in workflow: {str(e)}")
@@ -370,6 +619,7 @@ class MarketSummaryAgent:
 # Configuration and Scheduling
 def main():
     """Main function to set up and run the agent"""
+    from apscheduler.schedulers.blocking import BlockingScheduler
     
     # Email configuration (UPDATE THESE WITH YOUR CREDENTIALS)
     EMAIL_CONFIG = {
@@ -388,18 +638,26 @@ def main():
     agent = MarketSummaryAgent(EMAIL_CONFIG, RECIPIENT_EMAIL)
     
     # Schedule daily at 9:00 AM
-    schedule.every().day.at("09:00").do(agent.run)
+    scheduler = BlockingScheduler()
+    scheduler.add_job(
+        agent.run,
+        'cron',
+        hour=9,
+        minute=0,
+        max_instances=1,
+        coalesce=True,
+        misfire_grace_time=3600
+    )
     
     logger.info("Market Summary Agent started. Scheduled for 9:00 AM daily.")
     logger.info("Running initial test...")
     
-    # Run once immediately for testing
+    # Run once immediately; this also catches up on a run missed while the
+    # process was down, and is skipped if today's summary was already sent
     agent.run()
     
-    # Keep the script running
-    while True:
-        schedule.run_pending()
-        time.sleep(60)
+    # Block until the process is stopped, sleeping between runs
+    scheduler.start()
 
 
 if __name__ == "__main__":